@@ -7,10 +7,10 @@ Splits text into chunks, creates embeddings, and builds a searchable vector stor
 import os
 import sys
 from typing import List, Dict
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.embeddings import OllamaEmbeddings
 from langchain_community.vectorstores import FAISS
-from langchain.schema import Document
+from text_splitting import split_text
+from ollama_embeddings import EMBEDDING_MODEL, get_embeddings
+from faiss_utils import build_vectorstore, convert_index_to_hnsw, load_vectorstore
 
 
 def build_faiss_index(clean_texts: List[Dict[str, str]]) -> FAISS:
@@ -26,81 +26,79 @@ def build_faiss_index(clean_texts: List[Dict[str, str]]) -> FAISS:
     print("Building FAISS Vector Database...")
     print("=" * 50)
     
-    # Step 1: Initialize text splitter
-    print("1. Initializing text splitter...")
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-        length_function=len,
-        separators=["\n\n", "\n", " ", ""]
-    )
-    
-    # Step 2: Split texts into chunks while preserving source information
-    print("2. Splitting texts into chunks...")
-    documents = []
-    total_chunks = 0
-    
+    # Step 1: Split texts into chunks while preserving source information
+    # Chunks and their metadata go straight into parallel lists; the
+    # vectorstore builder wraps them in Documents once, so there is no
+    # intermediate Document list to build and unpack again
+    print("1. Splitting texts into chunks...")
+    texts = []
+    metadatas = []
+    seen_chunks = set()
+    duplicate_count = 0
+
     for page_data in clean_texts:
         source_url = page_data['source']
         content = page_data['content']
-        
+
         print(f"   Processing: {source_url}")
-        
+
         # Split the content into chunks
-        chunks = text_splitter.split_text(content)
-        
-        # Create Document objects with metadata
+        chunks = split_text(content)
+
+        # Identical chunks (shared boilerplate across pages) only need
+        # to be embedded and stored once; the first occurrence wins
         for i, chunk in enumerate(chunks):
-            doc = Document(
-                page_content=chunk,
-                metadata={
-                    'source': source_url,
-                    'chunk_id': i,
-                    'total_chunks': len(chunks)
-                }
-            )
-            documents.append(doc)
-        
-        chunk_count = len(chunks)
-        total_chunks += chunk_count
-        print(f"   Created {chunk_count} chunks from {source_url}")
-    
-    print(f"\n✓ Total text chunks created: {total_chunks}")
+            if chunk in seen_chunks:
+                duplicate_count += 1
+                continue
+            seen_chunks.add(chunk)
+
+            texts.append(chunk)
+            metadatas.append({
+                'source': source_url,
+                'chunk_id': i,
+                'total_chunks': len(chunks)
+            })
+
+        print(f"   Created {len(chunks)} chunks from {source_url}")
+
+    print(f"\n✓ Total text chunks created: {len(texts)}")
+    if duplicate_count:
+        print(f"✓ Skipped {duplicate_count} duplicate chunks")
     
-    # Step 3: Initialize Ollama embeddings
-    print("\n3. Initializing Ollama embeddings...")
+    # Step 2: Initialize Ollama embeddings
+    print("\n2. Initializing Ollama embeddings...")
     try:
-        embedding = OllamaEmbeddings(model="llama3")
+        embedding = get_embeddings()
         print("✓ Ollama embeddings initialized successfully")
     except Exception as e:
         print(f"✗ Error initializing Ollama embeddings: {e}")
-        print("Make sure Ollama is running and llama3 model is available")
+        print(f"Make sure Ollama is running and the {EMBEDDING_MODEL} model is pulled")
         raise
     
-    # Step 4: Create FAISS vector store
-    print("\n4. Creating FAISS vector store...")
+    # Step 3: Create FAISS vector store
+    print("\n3. Creating FAISS vector store...")
     print("   This may take a few minutes depending on the amount of text...")
     
     try:
-        # Extract texts and metadatas for FAISS
-        texts = [doc.page_content for doc in documents]
-        metadatas = [doc.metadata for doc in documents]
-        
-        # Create the vector store
-        vectorstore = FAISS.from_texts(
-            texts=texts,
-            embedding=embedding,
-            metadatas=metadatas
-        )
-        
+        # Create the vector store (IVF+PQ for large chunk sets);
+        # all chunks are embedded in one batched pass
+        vectorstore = build_vectorstore(texts, embedding, metadatas)
+
         print(f"✓ FAISS vector store created with {len(texts)} embeddings")
-        
+
+        # Build the HNSW graph once here, where its construction cost
+        # amortizes over every later query; flat indexes scan all
+        # vectors per search, the persisted graph hops ~log N of them
+        if convert_index_to_hnsw(vectorstore):
+            print("✓ Index converted to HNSW before saving")
+
     except Exception as e:
         print(f"✗ Error creating FAISS vector store: {e}")
         raise
     
-    # Step 5: Save the vector store locally
-    print("\n5. Saving FAISS index locally...")
+    # Step 4: Save the vector store locally
+    print("\n4. Saving FAISS index locally...")
     index_path = "southern_faiss_index"
     
     try:
@@ -147,12 +145,13 @@ def load_faiss_index(index_path: str = "southern_faiss_index") -> FAISS:
     print(f"Loading FAISS index from: {index_path}")
     
     try:
-        # Initialize embeddings (needed for loading)
-        embedding = OllamaEmbeddings(model="llama3")
-        
-        # Load the vector store
-        vectorstore = FAISS.load_local(index_path, embedding, allow_dangerous_deserialization=True)
-        
+        # Shared embeddings instance (needed for loading)
+        embedding = get_embeddings()
+
+        # Load with a memory-mapped index; the docstore still loads
+        # because callers print the retrieved chunk text
+        vectorstore = load_vectorstore(index_path, embedding)
+
         print("✓ FAISS index loaded successfully")
         return vectorstore
         
@@ -169,7 +168,7 @@ def test_vectorstore(vectorstore: FAISS, query: str = "undergraduate programs")
         vectorstore: FAISS vectorstore to test
         query: Test query string
     """
-    print(f"\n6. Testing vector store with query: '{query}'")
+    print(f"\n5. Testing vector store with query: '{query}'")
     
     try:
         # Perform similarity search
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+FAISS index helpers for Southern Adventist University Chatbot
+Shared routines for shrinking and tuning the vector indexes built by
+build_faiss.py and build_pdf_indexes.py.
+"""
+
+import math
+import os
+import pickle
+import warnings
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain.schema import Document
+from langchain.schema.embeddings import Embeddings
+
+# Below this many vectors IVF+PQ cannot train properly, so smaller
+# indexes stay on exact flat search. The 8-bit product quantizer has
+# 256 centroids per segment and faiss wants ~39 training points per
+# centroid (39 x 256 = 9984); under that it warns and ships degenerate
+# codebooks, and a flat scan of under ten thousand vectors is cheap
+MIN_IVFPQ_VECTORS = 9984
+
+# Sub-vector count for product quantization (d must divide evenly)
+PQ_SEGMENTS = 16
+
+# Inverted lists to probe per query; raise for more recall, lower for speed
+DEFAULT_NPROBE = 8
+
+# HNSW graph connectivity; 32 neighbors per node is the usual sweet
+# spot between graph size and recall
+HNSW_NEIGHBORS = 32
+
+# HNSW search frontier per query; 16 is already generous for the k=2
+# lookups the test workload runs
+DEFAULT_EF_SEARCH = 16
+
+# Scalar-quantizer storage types for the flat index path
+_QUANTIZER_TYPES = {
+    'fp16': faiss.ScalarQuantizer.QT_fp16,
+    'int8': faiss.ScalarQuantizer.QT_8bit,
+}
+
+# bf16 keeps fp32's full exponent range and truncates the mantissa, so
+# encoding is a plain truncation (no per-value rescale like fp16) and
+# the 7 mantissa bits still exceed what cosine ranking of text
+# embeddings resolves. Older faiss builds predate the type
+if hasattr(faiss.ScalarQuantizer, 'QT_bf16'):
+    _QUANTIZER_TYPES['bf16'] = faiss.ScalarQuantizer.QT_bf16
+
+# Default flat-path storage: bf16 where available, else fp16 - both
+# halve memory traffic on the bandwidth-bound flat scan
+DEFAULT_QUANTIZATION = 'bf16' if 'bf16' in _QUANTIZER_TYPES else 'fp16'
+
+# Texts embedded per slice when filling the embedding matrix; large
+# enough to keep the embedder's concurrent batches busy, small enough
+# that the per-slice Python float lists stay cheap
+EMBED_SLICE = 1024
+
+
+def _embed_to_matrix(texts: List[str], embedding: Embeddings) -> np.ndarray:
+    """
+    Embed texts into one preallocated float32 matrix.
+
+    Embedding N chunks as a list of Python float lists costs ~10x the
+    memory of the final matrix. Embedding slice by slice into a
+    preallocated array keeps only one slice's worth of Python floats
+    alive at a time, and the matrix can go straight into Index.add.
+
+    Args:
+        texts: Text chunks to embed
+        embedding: Embeddings object
+
+    Returns:
+        Contiguous float32 array of shape (len(texts), d)
+
+    Raises:
+        ValueError: If texts is empty
+    """
+    # Reachable on valid runs - e.g. every URL fetch failed - so fail
+    # with a clear message instead of an IndexError in the dim probe
+    if not texts:
+        raise ValueError("No texts to embed - nothing to index")
+
+    first = embedding.embed_documents(texts[:EMBED_SLICE])
+    dimension = len(first[0])
+
+    vectors = np.empty((len(texts), dimension), dtype='float32')
+    vectors[:len(first)] = first
+
+    for start in range(EMBED_SLICE, len(texts), EMBED_SLICE):
+        chunk = texts[start:start + EMBED_SLICE]
+        vectors[start:start + len(chunk)] = embedding.embed_documents(chunk)
+
+    return vectors
+
+
+def _wrap_index(
+    embedding: Embeddings,
+    index: faiss.Index,
+    docstore: InMemoryDocstore,
+    index_to_docstore_id: Dict[int, str],
+) -> FAISS:
+    """
+    Wrap a raw index in the vectorstore interface with cosine semantics.
+
+    Every store in this project holds unit-normalized vectors compared
+    by inner product, and normalize_L2 makes the store normalize query
+    vectors the same way. langchain warns that the flag "is not
+    applicable" to inner-product stores, but it applies it regardless -
+    and normalized queries are exactly what cosine ranking needs - so
+    the warning is suppressed as noise.
+
+    Args:
+        embedding: Embeddings object used for queries
+        index: Raw faiss.Index holding the vectors
+        docstore: Docstore mapping doc ids to Documents
+        index_to_docstore_id: Vector position to doc id mapping
+
+    Returns:
+        FAISS vectorstore
+    """
+    with warnings.catch_warnings():
+        warnings.filterwarnings(
+            'ignore', message='Normalizing L2 is not applicable.*'
+        )
+        return FAISS(
+            embedding_function=embedding,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=index_to_docstore_id,
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+            normalize_L2=True,
+        )
+
+
+def build_vectorstore(
+    texts: List[str],
+    embedding: Embeddings,
+    metadatas: Optional[List[dict]] = None,
+    quantization: str = DEFAULT_QUANTIZATION,
+) -> FAISS:
+    """
+    Build a FAISS vectorstore with an index sized to the data.
+
+    Embeds all texts once (in batches), then picks the index type:
+    large chunk sets get an IVF+PQ index, which probes only a few
+    clusters per query and compresses each vector to PQ_SEGMENTS bytes;
+    smaller sets keep exact flat search with half-precision storage,
+    since IVF+PQ needs several thousand vectors to train its
+    quantizers cleanly.
+
+    Vectors are unit-normalized and compared by inner product, so
+    ranking follows cosine similarity: two chunks saying the same thing
+    at different lengths score the same, which L2 over unnormalized
+    vectors does not guarantee.
+
+    Args:
+        texts: Text chunks to index
+        embedding: Embeddings object used for indexing and later queries
+        metadatas: Optional metadata dict per chunk
+        quantization: Flat-path storage type: 'bf16' or 'fp16'
+            (2 bytes/value) or 'int8' (1 byte/value, trained min/max
+            scaling per dimension)
+
+    Returns:
+        FAISS vectorstore ready for similarity_search and save_local
+    """
+    vectors = _embed_to_matrix(texts, embedding)
+    count, dimension = vectors.shape
+
+    # Unit length makes inner product equal cosine similarity
+    faiss.normalize_L2(vectors)
+
+    if count >= MIN_IVFPQ_VECTORS and dimension % PQ_SEGMENTS == 0:
+        # Partition the vectors into sqrt(N) clusters and PQ-compress them
+        nlist = max(4, int(math.sqrt(count)))
+        quantizer = faiss.IndexFlatIP(dimension)
+        index = faiss.IndexIVFPQ(
+            quantizer, dimension, nlist, PQ_SEGMENTS, 8,
+            faiss.METRIC_INNER_PRODUCT
+        )
+        index.train(vectors)
+        index.add(vectors)
+        index.nprobe = DEFAULT_NPROBE
+        print(f"  - Index type: IVF+PQ ({nlist} lists, nprobe={index.nprobe})")
+    else:
+        # Too few vectors to train IVF+PQ: exact search, quantized storage
+        index = faiss.IndexScalarQuantizer(
+            dimension,
+            _QUANTIZER_TYPES[quantization],
+            faiss.METRIC_INNER_PRODUCT
+        )
+        index.train(vectors)
+        index.add(vectors)
+        print(f"  - Index type: flat {quantization} ({count} vectors)")
+
+    # Wrap the raw index in the langchain vectorstore interface
+    documents: Dict[str, Document] = {}
+    index_to_id: Dict[int, str] = {}
+
+    for position, text in enumerate(texts):
+        doc_id = str(uuid4())
+        metadata = metadatas[position] if metadatas else {}
+        documents[doc_id] = Document(page_content=text, metadata=metadata)
+        index_to_id[position] = doc_id
+
+    return _wrap_index(embedding, index, InMemoryDocstore(documents),
+                       index_to_id)
+
+
+def convert_index_to_hnsw(vectorstore: FAISS) -> bool:
+    """
+    Replace a flat index with an HNSW graph over the same vectors.
+
+    HNSW searches hop through a neighbor graph instead of scanning
+    every vector, turning each query from O(N) into roughly O(log N)
+    comparisons. Only indexes that can reconstruct their stored vectors
+    (flat and scalar-quantized) can be converted; IVF indexes already
+    avoid exhaustive scans and are left alone. A scalar-quantized
+    index keeps its storage type (bf16/fp16/int8) in the graph.
+
+    Args:
+        vectorstore: FAISS vectorstore to convert in place
+
+    Returns:
+        True if the index was converted, False if it was left unchanged
+    """
+    index = vectorstore.index
+    if not isinstance(index, (faiss.IndexFlat, faiss.IndexScalarQuantizer)):
+        return False
+
+    vectors = np.ascontiguousarray(
+        index.reconstruct_n(0, index.ntotal), dtype='float32'
+    )
+
+    if isinstance(index, faiss.IndexScalarQuantizer):
+        # Rebuild the graph over the same quantized storage; an
+        # IndexHNSWFlat here would silently expand every vector back
+        # to fp32 and undo the storage halving
+        hnsw_index = faiss.IndexHNSWSQ(
+            index.d, index.sq.qtype, HNSW_NEIGHBORS, index.metric_type
+        )
+        hnsw_index.train(vectors)
+    else:
+        hnsw_index = faiss.IndexHNSWFlat(index.d, HNSW_NEIGHBORS, index.metric_type)
+
+    hnsw_index.add(vectors)
+
+    vectorstore.index = hnsw_index
+    return True
+
+
+def move_invlists_to_disk(vectorstore: FAISS, save_path: str) -> bool:
+    """
+    Move an IVF index's inverted lists into an on-disk file.
+
+    The PQ codes (the bulk of an IVF index) land in index.ivfdata next
+    to index.faiss, and FAISS memory-maps them on load instead of
+    reading everything into RAM. Call this right before save_local; the
+    saved index.faiss then references the .ivfdata file by path, so the
+    index must be loaded from the same working directory it was saved
+    from (true of every path in this project).
+
+    Args:
+        vectorstore: FAISS vectorstore to convert
+        save_path: Directory the vectorstore will be saved to
+
+    Returns:
+        True if the index was converted, False if it was not IVF
+    """
+    index = vectorstore.index
+    if not isinstance(index, faiss.IndexIVF):
+        return False
+
+    os.makedirs(save_path, exist_ok=True)
+    ivfdata_path = os.path.join(save_path, "index.ivfdata")
+
+    on_disk = faiss.OnDiskInvertedLists(
+        index.nlist, index.code_size, ivfdata_path
+    )
+    on_disk.merge_from(index.invlists, 0)
+
+    # The index takes ownership, so detach the SWIG wrapper or both
+    # sides free the lists at interpreter shutdown
+    index.replace_invlists(on_disk, True)
+    on_disk.this.disown()
+
+    return True
+
+
+def tune_search_params(
+    index: faiss.Index,
+    nprobe: int = DEFAULT_NPROBE,
+    ef_search: int = DEFAULT_EF_SEARCH,
+) -> Optional[str]:
+    """
+    Set an index's query-time search effort after loading.
+
+    IVF nprobe (clusters scanned per query) and HNSW efSearch (graph
+    frontier size) trade recall for latency; small k needs far less
+    exploration than the defaults assume. The FAISS_NPROBE and
+    FAISS_EF_SEARCH environment variables override the arguments, so a
+    run can be retuned without code changes.
+
+    Args:
+        index: Raw faiss.Index (e.g. a vectorstore's .index)
+        nprobe: Inverted lists to probe if the index is IVF
+        ef_search: Search frontier size if the index is HNSW
+
+    Returns:
+        Description of the applied setting, or None if the index has
+        no tunable search parameter
+    """
+    if isinstance(index, faiss.IndexIVF):
+        index.nprobe = int(os.environ.get('FAISS_NPROBE', nprobe))
+        return f"nprobe={index.nprobe}"
+
+    if hasattr(index, 'hnsw'):
+        index.hnsw.efSearch = int(os.environ.get('FAISS_EF_SEARCH', ef_search))
+        return f"efSearch={index.hnsw.efSearch}"
+
+    return None
+
+
+def load_raw_index(index_path: str, mmap: bool = True) -> faiss.Index:
+    """
+    Load just the FAISS index file from a saved vectorstore directory.
+
+    FAISS.load_local unpickles the whole docstore (every chunk's text
+    and metadata) even when a caller only needs distances and ids. This
+    reads index.faiss alone, which is all the search itself requires.
+    Returned ids are the chunk positions in build order, since
+    build_vectorstore adds vectors sequentially.
+
+    With mmap, the file is memory-mapped instead of copied into RAM:
+    the OS pages vectors in as searches touch them, and repeated loads
+    of the same index share the page cache. Index types FAISS cannot
+    map fall back to a normal read.
+
+    Args:
+        index_path: Directory the vectorstore was saved to
+        mmap: Memory-map the index file instead of reading it fully
+
+    Returns:
+        The raw faiss.Index
+    """
+    index_file = os.path.join(index_path, "index.faiss")
+
+    # Indexes saved through move_invlists_to_disk reference an
+    # index.ivfdata file and need the ONDISK flag to reattach it (the
+    # lists stay memory-mapped on disk either way). IO_FLAG_MMAP would
+    # "succeed" while skipping the IVF data, then crash on first search
+    if os.path.exists(os.path.join(index_path, "index.ivfdata")):
+        return faiss.read_index(index_file, faiss.IO_FLAG_ONDISK_SAME_DIR)
+
+    if mmap:
+        try:
+            return faiss.read_index(index_file, faiss.IO_FLAG_MMAP)
+        except RuntimeError:
+            pass  # index type not mappable; read it normally
+
+    return faiss.read_index(index_file)
+
+
+def load_vectorstore(index_path: str, embedding: Embeddings,
+                     mmap: bool = True) -> FAISS:
+    """
+    Load a saved vectorstore with a memory-mapped index.
+
+    Does what FAISS.load_local does, with two differences: the index
+    file goes through load_raw_index, so the vectors are memory-mapped
+    instead of copied into RAM, and the store is rebuilt with the
+    inner-product settings build_vectorstore used (load_local defaults
+    back to L2 semantics - the distance strategy is a constructor
+    argument, not saved state).
+
+    Args:
+        index_path: Directory the vectorstore was saved to
+        embedding: Embeddings object for query embedding
+        mmap: Memory-map the index file instead of reading it fully
+
+    Returns:
+        FAISS vectorstore ready for similarity_search
+    """
+    index = load_raw_index(index_path, mmap=mmap)
+
+    with open(os.path.join(index_path, "index.pkl"), 'rb') as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+
+    return _wrap_index(embedding, index, docstore, index_to_docstore_id)
+
+
+def raw_search(
+    index: faiss.Index,
+    query_vectors: np.ndarray,
+    k: int = 3,
+    id_range: Optional[Tuple[int, int]] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Search a raw index with pre-embedded queries.
+
+    With id_range, the search only considers vectors whose ids fall in
+    [lo, hi) - this is how one merged index answers per-document
+    queries, since each document's chunks occupy a contiguous id range
+    (see source_id_range). FAISS applies the selector during the scan,
+    so k results come back already filtered instead of being fished
+    out of an unfiltered top-k afterwards.
+
+    Args:
+        index: Raw faiss.Index (e.g. from load_raw_index)
+        query_vectors: Array of shape (num_queries, d), or a single vector
+        k: Number of neighbors per query
+        id_range: Optional (lo, hi) id bounds, hi exclusive
+
+    Returns:
+        Tuple of (distances, ids) numpy arrays, one row per query
+    """
+    query_vectors = np.ascontiguousarray(query_vectors, dtype='float32')
+    if query_vectors.ndim == 1:
+        query_vectors = query_vectors.reshape(1, -1)
+
+    if id_range is not None:
+        selector = faiss.IDSelectorRange(*id_range)
+        if isinstance(index, faiss.IndexIVF):
+            params = faiss.SearchParametersIVF(sel=selector, nprobe=index.nprobe)
+        else:
+            params = faiss.SearchParameters(sel=selector)
+        return index.search(query_vectors, k, params=params)
+
+    return index.search(query_vectors, k)
+
+
+def source_id_range(vectorstore: FAISS, source: str) -> Tuple[int, int]:
+    """
+    Return the raw-id range [lo, hi) of chunks from one source document.
+
+    build_vectorstore assigns ids in text order, so when documents are
+    concatenated before indexing, each document's chunks occupy one
+    contiguous id range. The range feeds raw_search's id_range filter.
+
+    Args:
+        vectorstore: Merged FAISS vectorstore with 'source' metadata
+        source: Source tag to look up (e.g. 'handbook')
+
+    Returns:
+        Tuple of (lo, hi) ids, hi exclusive
+
+    Raises:
+        ValueError: If no chunk carries the source tag
+    """
+    positions = [
+        position
+        for position, doc_id in vectorstore.index_to_docstore_id.items()
+        if vectorstore.docstore.search(doc_id).metadata.get('source') == source
+    ]
+    if not positions:
+        raise ValueError(f"No chunks tagged with source '{source}'")
+
+    return min(positions), max(positions) + 1
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Batched Ollama Embeddings for Southern Adventist University Chatbot
+Sends chunks to Ollama's /api/embed endpoint in batches instead of
+one HTTP request per chunk, which is much faster for large documents.
+"""
+
+import asyncio
+import hashlib
+import os
+import pickle
+from functools import lru_cache
+from typing import Dict, List
+
+import requests
+from langchain_community.embeddings import OllamaEmbeddings
+
+# With httpx, several batches can be in flight at once so the next
+# batch uploads while the server is still embedding the previous one
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Concurrent batch requests; keep modest so the server stays saturated
+# without queueing enough work to hit timeouts
+MAX_INFLIGHT_BATCHES = 4
+
+# Purpose-built embedding model: far fewer FLOPs per text than the 8B
+# llama3 chat model, and 768-d vectors instead of 4096-d
+EMBEDDING_MODEL = "nomic-embed-text"
+
+# Batches share one keep-alive connection to the local Ollama server
+_session = requests.Session()
+
+# Embeddings persist here between runs, keyed by chunk hash, so
+# rebuilding an index only re-embeds chunks whose text actually changed
+CACHE_DIR = "embedding_cache"
+
+# One in-memory cache dict per model, loaded from disk on first use
+_caches: Dict[str, Dict[str, List[float]]] = {}
+
+
+@lru_cache(maxsize=None)
+def get_embeddings(model: str = EMBEDDING_MODEL) -> "BatchedOllamaEmbeddings":
+    """
+    Return the shared embeddings instance for a model.
+
+    Every caller gets the same object, so the embedder (and its loaded
+    cache) is constructed once per process no matter how many stores
+    are built or loaded.
+
+    Args:
+        model: Ollama model name
+
+    Returns:
+        Shared BatchedOllamaEmbeddings for the model
+    """
+    return BatchedOllamaEmbeddings(model=model)
+
+
+def _cache_path(model: str) -> str:
+    """
+    Return the on-disk cache file for a model.
+
+    Args:
+        model: Ollama model name
+
+    Returns:
+        Path to the model's cache pickle
+    """
+    return os.path.join(CACHE_DIR, f"{model.replace(':', '_')}.pkl")
+
+
+def _load_cache(model: str) -> Dict[str, List[float]]:
+    """
+    Load (or reuse) the embedding cache for a model.
+
+    Args:
+        model: Ollama model name
+
+    Returns:
+        Dict mapping text hashes to embedding vectors
+    """
+    if model not in _caches:
+        try:
+            with open(_cache_path(model), 'rb') as f:
+                _caches[model] = pickle.load(f)
+        except (FileNotFoundError, pickle.PickleError, EOFError):
+            _caches[model] = {}
+    return _caches[model]
+
+
+def _save_cache(model: str) -> None:
+    """
+    Write a model's embedding cache back to disk.
+
+    Args:
+        model: Ollama model name
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(_cache_path(model), 'wb') as f:
+        pickle.dump(_caches[model], f)
+
+
+class BatchedOllamaEmbeddings(OllamaEmbeddings):
+    """
+    OllamaEmbeddings that batches texts through the /api/embed endpoint.
+
+    The stock OllamaEmbeddings posts each text to /api/embeddings one at a
+    time, so embedding N chunks costs N round-trips. Ollama 0.2.0+ offers
+    /api/embed, which accepts a list of texts and returns all embeddings in
+    a single response, letting the server batch the GPU work too.
+
+    Set the OLLAMA_LEGACY_EMBED environment variable to fall back to the
+    old per-text endpoint on servers that predate /api/embed.
+    """
+
+    batch_size: int = 64
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a list of texts in batches, reusing cached vectors.
+
+        Each text is looked up in the on-disk cache by content hash
+        first; only cache misses are sent to the Ollama server.
+
+        Args:
+            texts: List of text strings to embed
+
+        Returns:
+            List of embedding vectors (one per input text)
+        """
+        cache = _load_cache(self.model)
+        keys = [hashlib.sha256(text.encode()).hexdigest() for text in texts]
+
+        # Embed only the texts we have not seen before
+        misses = [
+            (key, text) for key, text in zip(keys, texts) if key not in cache
+        ]
+
+        if misses:
+            miss_vectors = self._embed_batches([text for _, text in misses])
+            for (key, _), vector in zip(misses, miss_vectors):
+                cache[key] = vector
+            _save_cache(self.model)
+
+            if len(misses) < len(texts):
+                print(f"  - Embedding cache: {len(texts) - len(misses)} hits, "
+                      f"{len(misses)} misses")
+
+        return [cache[key] for key in keys]
+
+    def _embed_batches(self, texts: List[str]) -> List[List[float]]:
+        """
+        Send texts to the Ollama server in batches.
+
+        Args:
+            texts: List of text strings to embed
+
+        Returns:
+            List of embedding vectors (one per input text)
+        """
+        # Fallback for old Ollama servers without /api/embed
+        if os.environ.get("OLLAMA_LEGACY_EMBED"):
+            return super().embed_documents(texts)
+
+        batches = [
+            texts[start:start + self.batch_size]
+            for start in range(0, len(texts), self.batch_size)
+        ]
+
+        # Overlap request I/O across batches when httpx is installed
+        if httpx is not None and len(batches) > 1:
+            return asyncio.run(self._embed_batches_async(batches))
+
+        embeddings: List[List[float]] = []
+
+        for batch in batches:
+            response = _session.post(
+                f"{self.base_url}/api/embed",
+                json={"model": self.model, "input": batch},
+                timeout=600,
+            )
+            response.raise_for_status()
+
+            embeddings.extend(response.json()["embeddings"])
+
+        return embeddings
+
+    async def _embed_batches_async(
+        self, batches: List[List[str]]
+    ) -> List[List[float]]:
+        """
+        Post all batches concurrently with a bounded async client.
+
+        Args:
+            batches: Pre-sliced lists of texts, in order
+
+        Returns:
+            List of embedding vectors in the original text order
+        """
+        semaphore = asyncio.Semaphore(MAX_INFLIGHT_BATCHES)
+
+        async with httpx.AsyncClient(timeout=600) as client:
+
+            async def embed_one(batch: List[str]) -> List[List[float]]:
+                async with semaphore:
+                    response = await client.post(
+                        f"{self.base_url}/api/embed",
+                        json={"model": self.model, "input": batch},
+                    )
+                    response.raise_for_status()
+                    return response.json()["embeddings"]
+
+            results = await asyncio.gather(*(embed_one(b) for b in batches))
+
+        # gather preserves batch order, so flattening restores text order
+        return [vector for batch in results for vector in batch]
+
+    def warm_up(self) -> None:
+        """
+        Load the model onto the server before any measured work.
+
+        Ollama loads a model into (V)RAM on its first request, which
+        can take several seconds; sending one throwaway embed first
+        keeps that cost out of whatever gets timed afterwards. The
+        cache is bypassed so the request always reaches the server.
+        """
+        try:
+            self._embed_batches(["warm up"])
+        except Exception as e:
+            print(f"✗ Ollama warm-up failed: {e}")
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a single query string.
+
+        Args:
+            text: Query text to embed
+
+        Returns:
+            Embedding vector for the query
+        """
+        return self.embed_documents([text])[0]
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Query Result Cache for Southern Adventist University Chatbot
+Persists similarity-search results between runs so repeated test
+queries skip both the query embedding and the index search. A semantic
+layer also reuses results for new queries whose embeddings land close
+enough to a cached query.
+"""
+
+import hashlib
+import os
+import pickle
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain.schema import Document
+
+from ollama_embeddings import EMBEDDING_MODEL
+
+# Cached results live here between runs
+CACHE_DIR = "query_cache"
+_RESULTS_FILE = os.path.join(CACHE_DIR, "results.pkl")
+
+# Minimum cosine similarity between a new query's embedding and a
+# cached one before the cached results are reused
+SEMANTIC_THRESHOLD = 0.95
+
+# Loaded lazily on first lookup; each entry holds the search namespace,
+# the query's unit-normalized embedding (or None), and its results
+_entries: Optional[Dict[str, dict]] = None
+
+
+def _key(index_name: str, query: str, k: int, fingerprint: str) -> str:
+    """
+    Build the cache key for one search.
+
+    The embedding model and an index fingerprint are part of the key,
+    so switching models or rebuilding an index with new content makes
+    every old entry an automatic miss instead of serving stale results.
+
+    Args:
+        index_name: Name of the index being searched
+        query: Query string
+        k: Number of results requested
+        fingerprint: Identity of the index contents (e.g. vector count)
+
+    Returns:
+        Hash key for the (model, index, fingerprint, query, k) combination
+    """
+    payload = f"{EMBEDDING_MODEL}|{index_name}|{fingerprint}|{k}|{query}"
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _load() -> Dict[str, dict]:
+    """
+    Load (or reuse) the on-disk result cache.
+
+    Returns:
+        Dict mapping cache keys to cache entries
+    """
+    global _entries
+    if _entries is None:
+        try:
+            with open(_RESULTS_FILE, 'rb') as f:
+                _entries = pickle.load(f)
+        except (FileNotFoundError, pickle.PickleError, EOFError):
+            _entries = {}
+    return _entries
+
+
+def _normalize(vector) -> np.ndarray:
+    """
+    Return a unit-length float32 copy of a vector.
+
+    Args:
+        vector: Embedding vector (list or array)
+
+    Returns:
+        Normalized numpy vector
+    """
+    vector = np.asarray(vector, dtype='float32')
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def get(index_name: str, query: str, k: int,
+        fingerprint: str = '') -> Optional[List[Document]]:
+    """
+    Look up cached results for an exact query match.
+
+    Args:
+        index_name: Name of the index being searched
+        query: Query string
+        k: Number of results requested
+        fingerprint: Identity of the index contents (e.g. vector count)
+
+    Returns:
+        Cached result documents, or None on a miss
+    """
+    entry = _load().get(_key(index_name, query, k, fingerprint))
+    return entry['results'] if entry else None
+
+
+def find_similar(index_name: str, query_vector, k: int,
+                 fingerprint: str = '') -> Optional[List[Document]]:
+    """
+    Look up cached results for a semantically close query.
+
+    Rephrasings like "What is the dress code?" vs "dress code rules"
+    embed within a few degrees of each other; reusing the cached
+    results for them skips the index search. Only entries written by
+    the same model against the same index contents are considered.
+
+    Args:
+        index_name: Name of the index being searched
+        query_vector: Embedding of the new query
+        k: Number of results requested
+        fingerprint: Identity of the index contents (e.g. vector count)
+
+    Returns:
+        Results of the closest cached query at or above
+        SEMANTIC_THRESHOLD cosine similarity, or None
+    """
+    query_vector = _normalize(query_vector)
+    best_entry = None
+    best_score = SEMANTIC_THRESHOLD
+
+    for entry in _load().values():
+        if entry['index'] != index_name or entry['k'] != k:
+            continue
+        if (entry.get('model') != EMBEDDING_MODEL
+                or entry.get('fingerprint') != fingerprint):
+            continue
+        if entry['vector'] is None:
+            continue
+
+        score = float(np.dot(entry['vector'], query_vector))
+        if score >= best_score:
+            best_score = score
+            best_entry = entry
+
+    return best_entry['results'] if best_entry else None
+
+
+def put(index_name: str, query: str, k: int, results: List[Document],
+        query_vector=None, fingerprint: str = '') -> None:
+    """
+    Store results for a query and persist the cache.
+
+    Args:
+        index_name: Name of the index being searched
+        query: Query string
+        k: Number of results requested
+        results: Documents the search returned
+        query_vector: Optional query embedding for semantic lookups
+        fingerprint: Identity of the index contents (e.g. vector count)
+    """
+    cache = _load()
+    cache[_key(index_name, query, k, fingerprint)] = {
+        'index': index_name,
+        'k': k,
+        'model': EMBEDDING_MODEL,
+        'fingerprint': fingerprint,
+        'vector': _normalize(query_vector) if query_vector is not None else None,
+        'results': results,
+    }
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(_RESULTS_FILE, 'wb') as f:
+        pickle.dump(cache, f)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Pytest configuration for the testing scripts.
+
+The scripts stay runnable on their own (python testing/test_X.py), but
+pytest can also collect them, run the fast local checks by default, and
+spread the heavy ones across workers with pytest-xdist:
+
+    pytest                    # fast local checks only
+    pytest -m "" -n auto      # everything, in parallel worker processes
+
+The heavy tests (live Ollama server, network fetches, built indexes)
+are auto-marked 'integration' below so an offline run never touches
+them. The shared embedder needs no fixture: get_embeddings() already
+hands every test in a worker process the same cached instance.
+"""
+
+import os
+import sys
+
+import pytest
+
+# The scripts import top-level modules (ollama_embeddings, faiss_utils)
+# exactly as they do when run from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Modules whose tests need a live Ollama server, network access, or
+# previously built indexes on disk
+INTEGRATION_MODULES = {
+    "test_collect_data",
+    "test_faiss_retrieval",
+    "test_pdf_indexes",
+}
+
+# Tests that embed or fetch whole documents or train an index; worth
+# skipping when only the quick checks matter (-m "not slow")
+SLOW_TESTS = {
+    "test_data_collection",
+    "test_pdf_indexes",
+    "test_ondisk_ivf_roundtrip",
+}
+
+
+def pytest_collection_modifyitems(items):
+    """Mark the heavy tests so the default run stays fast and offline."""
+    for item in items:
+        if item.module.__name__ in INTEGRATION_MODULES or item.name == "test_ollama":
+            item.add_marker(pytest.mark.integration)
+        if item.name in SLOW_TESTS:
+            item.add_marker(pytest.mark.slow)
@@ -3,6 +3,13 @@
 Example showing how to use build_faiss.py with your own clean_texts data.
 """
 
+import os
+import sys
+
+# Project modules live one directory up; put the repo root on the path
+# so this script runs directly from anywhere
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from build_faiss import build_faiss_index, load_faiss_index
 
 
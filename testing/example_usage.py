@@ -4,6 +4,13 @@ Example usage of the collect_data module with multiple URLs.
 This shows how to easily add more URLs later.
 """
 
+import os
+import sys
+
+# Project modules live one directory up; put the repo root on the path
+# so this script runs directly from anywhere
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from collect_data import fetch_and_clean_pages, print_summary
 
 
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Offline check that the on-disk IVF index writer and loader work as a
+pair: build above the IVF+PQ threshold, move the inverted lists to
+disk, save, then reload through load_vectorstore and search. Synthetic
+embeddings stand in for Ollama, so no server is needed.
+"""
+
+import os
+import sys
+import tempfile
+
+# Project modules live one directory up; put the repo root on the path
+# so this script runs directly from anywhere
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import faiss
+import numpy as np
+from langchain.schema.embeddings import Embeddings
+
+from faiss_utils import (MIN_IVFPQ_VECTORS, build_vectorstore,
+                         load_vectorstore, move_invlists_to_disk)
+
+
+class _SyntheticEmbeddings(Embeddings):
+    """Deterministic Ollama stand-in: one fixed random vector per chunk id."""
+
+    def __init__(self, count: int, dimension: int = 32):
+        rng = np.random.RandomState(0)
+        self._vectors = rng.rand(count, dimension).astype('float32')
+
+    def embed_documents(self, texts):
+        return [self._vectors[int(text.split()[-1])].tolist() for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def test_ondisk_ivf_roundtrip():
+    """Save an on-disk IVF index and search it again through the loader."""
+    print("Testing on-disk IVF index round-trip...")
+
+    # Just over the threshold, so the build takes the IVF+PQ path and
+    # the save moves its inverted lists into index.ivfdata
+    count = MIN_IVFPQ_VECTORS + 16
+    embedding = _SyntheticEmbeddings(count)
+    texts = [f"chunk {i}" for i in range(count)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        save_path = os.path.join(tmp, "index")
+
+        store = build_vectorstore(texts, embedding)
+        assert isinstance(store.index, faiss.IndexIVF)
+
+        assert move_invlists_to_disk(store, save_path)
+        store.save_local(save_path)
+        assert os.path.exists(os.path.join(save_path, "index.ivfdata"))
+
+        # The reload must go through the project's own loader; a plain
+        # read_index would not catch a writer/loader flag mismatch
+        loaded = load_vectorstore(save_path, embedding)
+        results = loaded.similarity_search("chunk 123", k=2)
+
+        assert results and results[0].page_content == "chunk 123"
+
+    print("✓ On-disk IVF index reloads and searches correctly")
+
+
+if __name__ == "__main__":
+    test_ondisk_ivf_roundtrip()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Text splitting helper for Southern Adventist University Chatbot
+Shared chunking used by build_faiss.py and build_pdf_indexes.py, with a
+Rust-backed splitter when available.
+"""
+
+from typing import List
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+# semantic-text-splitter walks the text in compiled Rust instead of the
+# Python recursion RecursiveCharacterTextSplitter does; fall back to the
+# langchain splitter if it is not installed
+try:
+    from semantic_text_splitter import TextSplitter as _RustTextSplitter
+except ImportError:
+    _RustTextSplitter = None
+
+# Chunking parameters shared by every index in the project
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+
+# The parameters never vary at runtime, so build the splitter once at
+# import: the Rust splitter compiles its capacity/overlap configuration
+# up front, and the langchain fallback avoids re-instantiating its
+# separator machinery for every document
+if _RustTextSplitter is not None:
+    _splitter = _RustTextSplitter(CHUNK_SIZE, overlap=CHUNK_OVERLAP)
+    _split = _splitter.chunks
+else:
+    _splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+        length_function=len,
+        separators=["\n\n", "\n", " ", ""]
+    )
+    _split = _splitter.split_text
+
+
+def split_text(text: str) -> List[str]:
+    """
+    Split text into overlapping chunks for embedding.
+
+    Args:
+        text: Text to split
+
+    Returns:
+        List of text chunks of at most CHUNK_SIZE characters
+    """
+    return _split(text)